@@ -4,8 +4,19 @@
 import re
 from io import StringIO
 
-# Matches lines like: *PAR123: some text . code_code
-BODY_LINE_REGEX = re.compile(r'^\*PAR(\d+):\s+(.*) . (\S+_\S+)$')
+# Matches the speaker prefix of lines like: *PAR123: some text . code_code
+# The trailing " . code_code" is split off by parse_body_line
+BODY_LINE_REGEX = re.compile(r'^\*PAR(\d+):\s(.*)$')
+# Timestamp code "code_milliseconds"; the group is everything after the last '_'
+TIMESTAMP_CODE_REGEX = re.compile(r'\S+_(\S+)')
+
+# C-unit segmentation patterns, compiled once rather than on every utterance
+FILLER_REGEX = re.compile(r'&-(\w+)')
+MULTI_WORD_REPEAT_REGEX = re.compile(r'<([^>]+)>\s*\[/\]\s*\1')
+SINGLE_WORD_REPEAT_REGEX = re.compile(r'(\S+)\s*\[/\]\s*\1')
+
+# Maps the other C-unit terminators onto '.' so a plain str.split suffices
+C_UNIT_TERMINATORS = str.maketrans({'?': '.', '!': '.'})
 
 PROMPTS = {
     'happy': 'excited or really happy',
@@ -16,6 +27,24 @@ PROMPTS = {
     'important': 'very important to you'
 }
 
+# Total input size below which callers should convert serially: starting a
+# worker process costs ~150 ms, while a typical transcript converts in < 10 ms
+PARALLEL_MIN_INPUT_SIZE = 4 * 1024 * 1024
+
+# Prompt phrases lowercased once at import so utterances only need lowering
+# once each. Checked one by one, so phrases may overlap or contain each other.
+LOWERED_PROMPTS = {name: phrase.lower() for name, phrase in PROMPTS.items()}
+
+
+def find_prompts(text):
+    """
+    Returns the names of the Global Tales prompts whose phrase occurs in text,
+    in PROMPTS order. Matching is case-insensitive; the text is lowered once
+    and checked against the pre-lowered LOWERED_PROMPTS.
+    """
+    text = text.lower()
+    return [name for name, phrase in LOWERED_PROMPTS.items() if phrase in text]
+
 
 def segment_into_c_units(text):
     """
@@ -26,112 +55,148 @@ def segment_into_c_units(text):
       3. Discard empty units
       4. Add a final period to each unit
     """
-    # Replace &-<word> patterns with (<word>)
-    text = re.sub(r'&-(\w+)', r'(\1)', text)
+    # Replace &-<word> patterns with (<word>); each marker pass is skipped
+    # when a cheap substring check shows it cannot match
+    if '&-' in text:
+        text = FILLER_REGEX.sub(r'(\1)', text)
     
     # Handle [/] marker for multi-word repetitions: <words> [/] words -> (words) words
-    text = re.sub(r'<([^>]+)>\s*\[/\]\s*\1', r'(\1) \1', text)
+    if '[/]' in text and '<' in text:
+        text = MULTI_WORD_REPEAT_REGEX.sub(r'(\1) \1', text)
     
     # Handle [/] marker for single-word repetitions: word [/] word -> (word) word
-    text = re.sub(r'(\S+)\s*\[/\]\s*\1', r'(\1) \1', text)
+    # (checked again, as the multi-word pass may have consumed every marker)
+    if '[/]' in text:
+        text = SINGLE_WORD_REPEAT_REGEX.sub(r'(\1) \1', text)
     
     # Split on punctuation marks that can end a C-unit
-    raw_units = re.split(r'[.?!]', text)
+    raw_units = text.translate(C_UNIT_TERMINATORS).split('.')
 
     c_units = []
+    append = c_units.append
     for unit in raw_units:
         unit = unit.strip()
-        if unit:
-            # Add final period if missing
-            if not unit.endswith('.'):
-                unit = unit + '.'
-            c_units.append(unit)
+        if not unit:
+            continue
+        # Add final period if missing
+        append(unit if unit[-1] == '.' else unit + '.')
 
     return c_units
 
 
-def process_cha_content(content, include_prompts=True):
+def parse_body_line(line):
+    """
+    Splits a *PAR line into (par_num, utterance_text, timestamp_ms).
+    The tail is parsed from the right with rpartition instead of letting
+    the regex backtrack over the whole utterance.
+    timestamp_ms is None when the code has no millisecond suffix.
+    Returns None if the line is not a timestamped participant line.
+    """
+    line_match = BODY_LINE_REGEX.match(line)
+    if not line_match:
+        return None
+
+    # Tail is "<utterance> <separator char> <code>"
+    head, _, timestamp_code = line_match.group(2).rpartition(' ')
+    if len(head) < 2 or head[-2] != ' ':
+        return None
+    code_match = TIMESTAMP_CODE_REGEX.fullmatch(timestamp_code)
+    if not code_match:
+        return None
+
+    # The line is still kept when the suffix is not a number
+    timestamp_ms = code_match.group(1)
+    timestamp_ms = int(timestamp_ms) if timestamp_ms.isdecimal() else None
+
+    return line_match.group(1), head[:-2], timestamp_ms
+
+
+def process_cha_content(content, include_prompts=True, as_bytes=False):
     """
     Process CHAT format content and return converted text with prompt metadata.
     
     Args:
         content: String content of the .cha file
         include_prompts: Whether to detect and tag Global Tales prompts
+        as_bytes: Return the output already encoded as UTF-8 bytes
     
     Returns:
-        Tuple of (output_text, prompts_found_dict)
+        Tuple of (output_text, prompts_found_dict); output_text is UTF-8
+        bytes when as_bytes is True, otherwise str
     """
-    output = StringIO()
-    
-    lines = content.split('\n')
+    output_parts = []
     
-    # First pass: find which PAR contains "listen to each prompt" and get last timestamp
+    # Single pass: segment every utterance, noting which PAR contains
+    # "listen to each prompt" and the last timestamp as we go. Output is
+    # buffered per utterance because the E/C prefix is only known at the end.
     prompt_par = None
     last_timestamp = 0
-    for line in lines:
-        line = line.rstrip('\r\n\x15')
-        utterance_match = BODY_LINE_REGEX.match(line)
-        if utterance_match:
-            par_num = utterance_match.group(1)
-            utterance_text = utterance_match.group(2)
-            timestamp_code = utterance_match.group(3).strip()
-            
-            # Extract timestamp
-            try:
-                timestamp_ms = int(timestamp_code.split('_')[-1])
-                last_timestamp = timestamp_ms
-            except (ValueError, IndexError):
-                pass
-            
-            if 'listen to each prompt' in utterance_text:
-                prompt_par = par_num
+    utterances = []
     
     # Track which prompts were found
     prompts_found = {prompt: False for prompt in PROMPTS.keys()}
     
-    # Second pass: process the file
-    output.write("- 0:00\n")
+    # Bind globals and bound methods used on every line to locals
+    parse_line = parse_body_line
+    segment = segment_into_c_units
+    add_utterance = utterances.append
     
-    for line in lines:
+    # Iterate lazily rather than materialising a list of every line;
+    # '\r\n' and bare '\r' line endings are treated like '\n'
+    for line in StringIO(content, newline=None):
+        # Headers, dependent tiers and other speakers can never match
+        if not line.startswith('*PAR'):
+            continue
         line = line.rstrip('\r\n\x15')
-        utterance_match = BODY_LINE_REGEX.match(line)
-        if utterance_match:
-            par_num = utterance_match.group(1)
-            utterance_text = utterance_match.group(2)
-            timestamp_code = utterance_match.group(3).strip()
+        body_line = parse_line(line)
+        if body_line:
+            par_num, utterance_text, timestamp_ms = body_line
             
-            # Extract timestamp from the code (format: code_milliseconds)
-            try:
-                timestamp_ms = int(timestamp_code.split('_')[-1])
+            if timestamp_ms is not None:
                 last_timestamp = timestamp_ms
-            except (ValueError, IndexError):
-                pass
+            
+            if 'listen to each prompt' in utterance_text:
+                prompt_par = par_num
 
             # Convert to C-units
-            c_units = segment_into_c_units(utterance_text)
-
-            # Determine prefix: 'E' for the PAR with "listen to each prompt", 'C' for the other
-            if prompt_par and par_num == prompt_par:
-                prefix = 'E'
-            else:
-                prefix = 'C'
-
-            # Write each unit as a separate line with appropriate prefix
-            for cu in c_units:
-                output.write(f"{prefix} {cu}\n")
-                
-                # Only check for prompts if enabled
-                if include_prompts:
-                    for prompt_name, prompt_phrase in PROMPTS.items():
-                        if prompt_phrase in utterance_text:
-                            output.write(f"+ {prompt_name}\n")
-                            prompts_found[prompt_name] = True
+            c_units = segment(utterance_text)
+
+            # Detect prompts once per utterance rather than once per C-unit;
+            # the tag block is still repeated after every unit, as before
+            prompt_block = ""
+            if include_prompts and c_units:
+                matched_prompts = find_prompts(utterance_text)
+                prompt_block = "".join(f"+ {name}\n" for name in matched_prompts)
+                for prompt_name in matched_prompts:
+                    prompts_found[prompt_name] = True
+
+            add_utterance((par_num, c_units, prompt_block))
+    
+    output_parts.append("- 0:00\n")
+    
+    for par_num, c_units, prompt_block in utterances:
+        if not c_units:
+            continue
+
+        # Determine prefix: 'E' for the PAR with "listen to each prompt", 'C' for the other
+        if prompt_par and par_num == prompt_par:
+            line_prefix = 'E '
+        else:
+            line_prefix = 'C '
+
+        # Write each unit as a separate line with appropriate prefix,
+        # joining the whole utterance in C into a single part
+        line_end = "\n" + prompt_block
+        output_parts.append(line_prefix + (line_end + line_prefix).join(c_units) + line_end)
     
     # Convert last timestamp from milliseconds to min:seconds and write at end
     if last_timestamp > 0:
         total_seconds = last_timestamp // 1000
         minutes = total_seconds // 60
         seconds = total_seconds % 60
-        output.write(f"- {minutes}:{seconds:02d}\n")
+        output_parts.append(f"- {minutes}:{seconds:02d}\n")
     
-    return output.getvalue(), prompts_found
+    output_text = "".join(output_parts)
+    if as_bytes:
+        output_text = output_text.encode('utf-8')
+    return output_text, prompts_found
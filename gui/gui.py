@@ -1,68 +1,78 @@
 #!/usr/bin/env python3
 
-import customtkinter as ctk
-from tkinter import filedialog, messagebox
 import os
 import threading
+import queue
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import subprocess
 import platform
-from chat2txt.processor import process_cha_content
+from pathlib import Path
+from chat2txt.processor import PARALLEL_MIN_INPUT_SIZE, process_cha_content
 
-def process_cha_file(input_file, output_text_widget, include_prompts=True):
-    """Process a single .cha file and write output to disk."""
+# Large I/O buffer so big output files are written in few syscalls
+IO_BUFFER_SIZE = 1 << 20
+
+# How often the Tk thread drains updates queued by the conversion worker
+UI_POLL_MS = 100
+
+def convert_cha_file(input_file, include_prompts=True):
+    """
+    Convert a single .cha file and write the result next to it.
+    
+    Runs in a worker process, so it must stay at module level and must not
+    touch any widgets.
+    
+    Returns:
+        Tuple of (output_file, prompts_found_dict)
+    """
+    base_name = os.path.splitext(input_file)[0]
+    output_file = base_name + '_CU.txt'
+    
+    # Read the input file as raw bytes and decode it in one go, rather than
+    # through an incremental text-mode decoder
+    content = Path(input_file).read_bytes().decode('utf-8-sig')
+    
+    # Process using shared processor, getting the output already encoded
+    output_data, prompts_found = process_cha_content(content, include_prompts, as_bytes=True)
+    
+    # Keep the platform's line endings, as the old text-mode write did
+    if os.linesep != '\n':
+        output_data = output_data.replace(b'\n', os.linesep.encode('ascii'))
+    
+    # Write output to disk in binary mode, skipping the text codec layer
+    with open(output_file, 'wb', buffering=IO_BUFFER_SIZE) as outfile:
+        outfile.write(output_data)
+    
+    return output_file, prompts_found
+
+
+def _convert_safely(input_file, include_prompts):
+    """
+    Run convert_cha_file, returning (result, error) instead of raising, so the
+    in-thread and worker-process paths report failures the same way.
+    """
     try:
-        base_name = os.path.splitext(input_file)[0]
-        output_file = base_name + '_CU.txt'
-        
-        output_text_widget.configure(state="normal")
-        output_text_widget.insert("end", f"\nProcessing: {os.path.basename(input_file)}\n")
-        output_text_widget.configure(state="disabled")
-        output_text_widget.see("end")
-        output_text_widget.update()
-        
-        # Read the input file
-        with open(input_file, 'r', encoding='utf-8-sig') as infile:
-            content = infile.read()
-        
-        # Process using shared processor
-        output_content, prompts_found = process_cha_content(content, include_prompts)
-        
-        # Write output to disk
-        with open(output_file, 'w', encoding='utf-8') as outfile:
-            outfile.write(output_content)
-        
-        # Print status of prompts found
-        output_text_widget.configure(state="normal")
-        output_text_widget.insert("end", f"\nProcessed {os.path.basename(input_file)}.")
-        
-        if include_prompts:
-            output_text_widget.insert("end", f" Prompts found:\n")
-            for prompt, found in prompts_found.items():
-                status = "✓ Found" if found else "✗ Not found"
-                output_text_widget.insert("end", f"  {prompt}: {status}\n")
-            
-            not_found = [prompt for prompt, found in prompts_found.items() if not found]
-            if not_found:
-                output_text_widget.insert("end", f"\nWarning: The following prompts were not found: {', '.join(not_found)}\n")
-        else:
-            output_text_widget.insert("end", f" (Prompts excluded)\n")
-        
-        output_text_widget.insert("end", f"✓ Output saved to: {output_file}\n")
-        output_text_widget.configure(state="disabled")
-        output_text_widget.see("end")
-        output_text_widget.update()
-        
+        return convert_cha_file(input_file, include_prompts), None
     except Exception as e:
-        output_text_widget.configure(state="normal")
-        output_text_widget.insert("end", f"✗ Error processing {input_file}: {str(e)}\n")
-        output_text_widget.configure(state="disabled")
-        output_text_widget.see("end")
-        output_text_widget.update()
+        return None, e
 
 
+def _total_input_size(file_paths):
+    """Sum the sizes of the given files, counting unreadable ones as empty."""
+    total = 0
+    for file_path in file_paths:
+        try:
+            total += os.path.getsize(file_path)
+        except OSError:
+            pass
+    return total
+
 
 class ChatToTxtGUI:
     def __init__(self, root):
+        import customtkinter as ctk
+        
         self.root = root
         self.root.title("Chat to TXT Converter")
         self.root.geometry("700x600")
@@ -115,9 +125,17 @@ class ChatToTxtGUI:
         
         self.selected_files = []
         self.output_folder = None
+        
+        # Worker threads never touch Tk directly; they queue callbacks here
+        self._ui_queue = queue.Queue()
+        # Output text gathered between polls and inserted in one go
+        self._pending_output = []
+        self.root.after(UI_POLL_MS, self._drain_ui_queue)
     
     def select_file(self):
         """Select a single .cha file."""
+        from tkinter import filedialog
+        
         file_path = filedialog.askopenfilename(
             title="Select a .cha file",
             filetypes=[("CHAT files", "*.cha"), ("All files", "*.*")]
@@ -130,11 +148,19 @@ class ChatToTxtGUI:
     
     def select_folder(self):
         """Select a folder containing .cha files."""
+        from tkinter import filedialog, messagebox
+        
         folder_path = filedialog.askdirectory(title="Select a folder containing .cha files")
         if folder_path:
-            cha_files = [f for f in os.listdir(folder_path) if f.endswith('.cha')]
+            # Skip hidden files such as macOS "._name.cha" metadata and any
+            # directories that happen to end in .cha
+            with os.scandir(folder_path) as entries:
+                cha_files = [
+                    entry.path for entry in entries
+                    if entry.name.endswith('.cha') and not entry.name.startswith('.') and entry.is_file()
+                ]
             if cha_files:
-                self.selected_files = [os.path.join(folder_path, f) for f in cha_files]
+                self.selected_files = cha_files
                 self.output_folder = folder_path
                 self.file_label.configure(text=f"Selected folder: {os.path.basename(folder_path)} ({len(cha_files)} .cha files found)", text_color="black")
                 self.open_button.configure(state="disabled")
@@ -146,6 +172,8 @@ class ChatToTxtGUI:
     
     def open_output(self):
         """Open the output folder in file explorer."""
+        from tkinter import messagebox
+        
         if self.output_folder is None:
             messagebox.showwarning("No Output", "Please select a file or folder first.")
             return
@@ -162,42 +190,144 @@ class ChatToTxtGUI:
     
     def clear_output(self):
         """Clear the output text box."""
+        self._pending_output.clear()
         self.output_text.configure(state="normal")
         self.output_text.delete(1.0, "end")
         self.output_text.configure(state="disabled")
     
     def run_conversion(self):
         """Run the conversion on selected files."""
+        from tkinter import messagebox
+        
         if not self.selected_files:
             messagebox.showerror("Error", "Please select a file or folder first.")
             return
         
-        self.output_text.configure(state="normal")
-        self.output_text.insert("end", "\n" + "="*50 + "\nStarting conversion...\n")
-        self.output_text.configure(state="disabled")
+        self._append_output("\n" + "="*50 + "\nStarting conversion...\n")
+        
+        # Tk variables may only be read on the main thread
+        include_prompts = self.include_prompts_var.get()
         
         # Run in a separate thread to avoid freezing the GUI
-        thread = threading.Thread(target=self._process_files)
+        thread = threading.Thread(target=self._process_files, args=(include_prompts,))
         thread.start()
     
-    def _process_files(self):
-        """Process all selected files."""
-        include_prompts = self.include_prompts_var.get()
-        for file_path in self.selected_files:
-            process_cha_file(file_path, self.output_text, include_prompts=include_prompts)
+    def _process_files(self, include_prompts):
+        """Process all selected files, across worker processes only for large batches."""
+        file_paths = list(self.selected_files)
+        max_workers = min(len(file_paths), os.cpu_count() or 1)
+        
+        if max_workers < 2 or _total_input_size(file_paths) < PARALLEL_MIN_INPUT_SIZE:
+            # Starting worker processes would take longer than the conversions
+            for file_path in file_paths:
+                file_name = self._log_start(file_path)
+                result, error = _convert_safely(file_path, include_prompts)
+                self._schedule(self._append_status, file_path, file_name, include_prompts, result, error)
+        else:
+            # Spawn rather than fork this multi-threaded Tk process; workers
+            # only import the processing code, so start-up stays cheap
+            mp_context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+                futures = {}
+                for file_path in file_paths:
+                    file_name = self._log_start(file_path)
+                    futures[executor.submit(_convert_safely, file_path, include_prompts)] = (file_path, file_name)
+                
+                for future in as_completed(futures):
+                    file_path, file_name = futures[future]
+                    try:
+                        result, error = future.result()
+                    except Exception as e:
+                        # The worker process itself failed
+                        result, error = None, e
+                    self._schedule(self._append_status, file_path, file_name, include_prompts, result, error)
+        
+        self._schedule(self._finish_conversion)
+    
+    def _log_start(self, file_path):
+        """Log that a file is being converted and return its display name."""
+        file_name = os.path.basename(file_path)
+        self._log(f"\nProcessing: {file_name}\n")
+        return file_name
+    
+    def _finish_conversion(self):
+        """Report completion after every queued status. Must run on the Tk thread."""
+        self._append_output("\n✓ All conversions completed!\n")
+        
+        # Enable the open button after conversion
+        self.open_button.configure(state="normal")
+    
+    def _schedule(self, callback, *args):
+        """Queue a callback to run on the Tk thread. Safe to call from any thread."""
+        self._ui_queue.put((callback, args))
+    
+    def _drain_ui_queue(self):
+        """Run every queued callback, then poll again even if one of them failed."""
+        try:
+            while True:
+                try:
+                    callback, args = self._ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                callback(*args)
+            self._flush_output()
+        finally:
+            self.root.after(UI_POLL_MS, self._drain_ui_queue)
+    
+    def _log(self, text):
+        """Queue text for the output box. Safe to call from any thread."""
+        self._schedule(self._append_output, text)
+    
+    def _append_output(self, text):
+        """Buffer text for the output box until the next flush. Must run on the Tk thread."""
+        self._pending_output.append(text)
+    
+    def _flush_output(self):
+        """Write all buffered text with a single insert. Must run on the Tk thread."""
+        if not self._pending_output:
+            return
+        text = "".join(self._pending_output)
+        self._pending_output.clear()
         
         self.output_text.configure(state="normal")
-        self.output_text.insert("end", "\n✓ All conversions completed!\n")
+        self.output_text.insert("end", text)
         self.output_text.configure(state="disabled")
         self.output_text.see("end")
-        self.output_text.update()
+    
+    def _append_status(self, input_file, file_name, include_prompts, result=None, error=None):
+        """Report the outcome of one finished conversion. Must run on the Tk thread."""
+        if error is not None:
+            self._append_output(f"✗ Error processing {input_file}: {str(error)}\n")
+            return
+        output_file, prompts_found = result
         
-        # Enable the open button after conversion
-        self.open_button.configure(state="normal")
+        # Print status of prompts found
+        lines = [f"\nProcessed {file_name}."]
+        
+        if include_prompts:
+            lines.append(" Prompts found:\n")
+            for prompt, found in prompts_found.items():
+                status = "✓ Found" if found else "✗ Not found"
+                lines.append(f"  {prompt}: {status}\n")
+            
+            not_found = [prompt for prompt, found in prompts_found.items() if not found]
+            if not_found:
+                lines.append(f"\nWarning: The following prompts were not found: {', '.join(not_found)}\n")
+        else:
+            lines.append(" (Prompts excluded)\n")
+        
+        lines.append(f"✓ Output saved to: {output_file}\n")
+        self._append_output("".join(lines))
 
 
 def main():
     """Entry point for the application."""
+    multiprocessing.freeze_support()  # Needed for worker processes in PyInstaller builds
+    
+    # Imported here so worker processes, which only need convert_cha_file,
+    # never load Tk or customtkinter
+    import customtkinter as ctk
+    
     ctk.set_appearance_mode("system")  # Follows system dark/light mode
     ctk.set_default_color_theme("blue")  # Modern blue theme
     root = ctk.CTk()
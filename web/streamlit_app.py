@@ -3,13 +3,40 @@
 import streamlit as st
 import os
 import sys
-import zipfile
-from io import StringIO
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import repeat
 
 # Add parent directory to path to import chat2txt module
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from chat2txt.processor import process_cha_content
+from chat2txt.processor import PARALLEL_MIN_INPUT_SIZE, process_cha_content
+
+
+def process_contents(contents, include_prompts):
+    """
+    Convert several CHAT documents, spreading them across processes only for large batches.
+    Outputs come back as UTF-8 bytes, ready for download and cheap to pass between processes.
+    """
+    max_workers = min(len(contents), os.cpu_count() or 1)
+    if max_workers < 2 or sum(len(content) for content in contents) < PARALLEL_MIN_INPUT_SIZE:
+        return [process_cha_content(content, include_prompts, as_bytes=True) for content in contents]
+    
+    # Spawn rather than fork the multi-threaded Streamlit server
+    mp_context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+        return list(executor.map(process_cha_content, contents, repeat(include_prompts), repeat(True)))
+
+
+@st.cache_data(show_spinner=False, max_entries=8, ttl=600)
+def process_uploads(uploads, include_prompts):
+    """
+    Decode and convert uploaded .cha files, cached on their raw bytes so widget-driven reruns skip the work.
+    The cache holds transcripts in server memory for at most 10 minutes and 8 batches.
+    """
+    contents = [data.decode('utf-8-sig') for data in uploads]
+    return process_contents(contents, include_prompts)
 
 
 def main():
@@ -49,15 +76,14 @@ def main():
             results = []
             download_files = {}
             
-            for uploaded_file in uploaded_files:
-                # Read the uploaded file
-                content = uploaded_file.read().decode('utf-8-sig')
+            # Process all uploads together so independent files can be
+            # converted in parallel
+            outputs = process_uploads([uploaded_file.getvalue() for uploaded_file in uploaded_files], include_prompts)
+            
+            for uploaded_file, (output_content, prompts_found) in zip(uploaded_files, outputs):
                 base_name = os.path.splitext(uploaded_file.name)[0]
                 output_name = f"{base_name}_CU.txt"
                 
-                # Process the file using shared processor
-                output_content, prompts_found = process_cha_content(content, include_prompts)
-                
                 # Store results
                 results.append({
                     'name': uploaded_file.name,
@@ -93,8 +119,10 @@ def main():
                     use_container_width=True
                 )
             else:
-                # Multiple files - zip download
-                zip_buffer = StringIO()
+                # Multiple files - zip download (ZipFile writes bytes)
+                import zipfile
+                
+                zip_buffer = BytesIO()
                 with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
                     for file_name, content in download_files.items():
                         zip_file.writestr(file_name, content)